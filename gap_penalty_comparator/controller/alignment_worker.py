@@ -1,10 +1,11 @@
 from model.needleman_wunsch import (backtrack_global_alignment, find_gaps,
-                                    value_propagation)
+                                    score_substitutions, value_propagation)
+from model.significance import build_null_model, significance_test
 from PyQt6.QtCore import QThread, pyqtSignal
 
 
 class AlignmentWorker(QThread):
-    result_ready = pyqtSignal(list, list, list, list)  # Signal to send results back to the main thread
+    result_ready = pyqtSignal(list, list, list, list, list)  # Signal to send results back to the main thread
     error_occurred = pyqtSignal(str)  # Signal to send error messages
 
     def __init__(self, seq1, seq2, gap_penalties, scoring_method):
@@ -20,16 +21,23 @@ class AlignmentWorker(QThread):
             arrow_matrices = []
             alignment_coordinates = []
             gaps = []
+            significance = []
+
+            use_blosum = self.scoring_method == "BLOSUM62"
+            # Share the substitution lookups between all gap penalties
+            substitution_scores = score_substitutions(self.seq1, self.seq2, use_blosum)
+            null_model = build_null_model(self.seq1, self.seq2, use_blosum)
 
             for penalty in self.gap_penalties:
-                val_matrix, arrow_matrix = value_propagation(self.seq1, self.seq2, penalty, self.scoring_method == "BLOSUM62")
+                val_matrix, arrow_matrix = value_propagation(self.seq1, self.seq2, penalty, use_blosum, substitution_scores)
                 coordinate_list = backtrack_global_alignment(self.seq1, self.seq2, arrow_matrix, val_matrix)
 
                 value_matrices.append(val_matrix)
                 arrow_matrices.append(arrow_matrix)
                 alignment_coordinates.append(coordinate_list)
                 gaps.append(find_gaps(coordinate_list))
+                significance.append(significance_test(self.seq1, self.seq2, penalty, use_blosum, null_model=null_model))
 
-            self.result_ready.emit(value_matrices, arrow_matrices, alignment_coordinates, gaps)
+            self.result_ready.emit(value_matrices, arrow_matrices, alignment_coordinates, gaps, significance)
         except Exception as e:
             self.error_occurred.emit(str(e))
\ No newline at end of file
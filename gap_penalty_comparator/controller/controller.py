@@ -4,11 +4,13 @@ from PyQt6.QtWidgets import QApplication, QPushButton
 from view.app import MainWindow
 
 from .alignment_worker import AlignmentWorker
+from .service_worker import ServiceWorker
 
 
 class Controller:
-    def __init__(self):
+    def __init__(self, service_url=None):
         self.app = QApplication([])
+        self.service_url = service_url
         self.view = MainWindow()
         
         self.view.findChild(QPushButton, "submitBtn").clicked.connect(self.run_algorithm)
@@ -40,7 +42,10 @@ class Controller:
             self.view.loading_cursor(True)
 
             # Create and start the worker thread to run the algorithm in parallell with the GUI's main thread
-            self.worker = AlignmentWorker(seq1, seq2, gap_penalties, scoring_method)
+            if self.service_url:
+                self.worker = ServiceWorker(self.service_url, seq1, seq2, gap_penalties, scoring_method)
+            else:
+                self.worker = AlignmentWorker(seq1, seq2, gap_penalties, scoring_method)
             self.worker.result_ready.connect(self.on_results_ready)
             self.worker.error_occurred.connect(self.on_error)
             self.worker.finished.connect(lambda: self.view.loading_cursor(False))
@@ -50,15 +55,18 @@ class Controller:
             print(e)
             self.view.popup_dialog(f"An unexpected error occurred. Try restarting the application.", "error")
     
-    def on_results_ready(self, value_matrices, arrow_matrices, alignment_coordinates, gaps):
+    def on_results_ready(self, value_matrices, arrow_matrices, alignment_coordinates, gaps, significance):
         """Handle results from the worker thread."""
         self.view.set_gaps(gaps)
+        self.view.set_significance(significance)
         self.view.display_matrices(value_matrices, arrow_matrices, (self.worker.seq1, self.worker.seq2), alignment_coordinates, self.worker.gap_penalties)
         self.view.loading_cursor(False)
 
     def on_error(self, error_message):
         """Handle errors from the worker thread."""
-        raise Exception(f"An error occured during the algorithm execution: {error_message}")
+        # Raising inside a Qt slot aborts the application, so show the error instead
+        print(error_message)
+        self.view.popup_dialog(f"An error occured during the algorithm execution: {error_message}", "error")
 
     def parse_input(self, input1, input2):
         """
@@ -0,0 +1,59 @@
+import json
+import socket
+import urllib.error
+import urllib.request
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from service.alignment_service import decode_results
+
+
+class ServiceWorker(QThread):
+    """
+    Submits an alignment request to a running alignment service instead of
+    computing it locally. Emits the same signals as AlignmentWorker.
+    """
+    result_ready = pyqtSignal(list, list, list, list, list)  # Signal to send results back to the main thread
+    error_occurred = pyqtSignal(str)  # Signal to send error messages
+
+    def __init__(self, service_url, seq1, seq2, gap_penalties, scoring_method, timeout=300):
+        super().__init__()
+        self.service_url = service_url.rstrip("/")
+        self.seq1 = seq1
+        self.seq2 = seq2
+        self.gap_penalties = gap_penalties
+        self.scoring_method = scoring_method
+        self.timeout = timeout
+
+    def run(self):
+        try:
+            body = json.dumps({
+                "seq1": self.seq1,
+                "seq2": self.seq2,
+                "gap_penalties": self.gap_penalties,
+                "scoring_method": self.scoring_method,
+            }).encode("utf-8")
+            request = urllib.request.Request(f"{self.service_url}/align", data=body, method="POST",
+                                             headers={"Content-Type": "application/json"})
+
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read())
+
+            self.result_ready.emit(*decode_results(payload["results"]))
+        except urllib.error.HTTPError as e:
+            if e.code == 503:
+                self.error_occurred.emit("The alignment service is busy. Please try again later.")
+            else:
+                self.error_occurred.emit(f"The alignment service returned an error: {self.error_detail(e)}")
+        except (TimeoutError, socket.timeout):
+            self.error_occurred.emit(f"The alignment service did not respond within {self.timeout} seconds.")
+        except urllib.error.URLError as e:
+            self.error_occurred.emit(f"Could not connect to the alignment service at {self.service_url}: {e.reason}")
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+    def error_detail(self, error):
+        """Returns the error message from the service's JSON response, if there is one."""
+        try:
+            return json.loads(error.read())["error"]
+        except (ValueError, KeyError, TypeError):
+            return str(error)
@@ -1,9 +1,28 @@
+import argparse
 import os
 import sys
 
-from controller.controller import Controller
-
 if __name__ == "__main__":
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-    controller = Controller()
-    controller.run()
+
+    parser = argparse.ArgumentParser(description="Gap Penalty Comparator")
+    parser.add_argument("--serve", action="store_true", help="run the shared alignment service instead of the GUI")
+    parser.add_argument("--host", default="127.0.0.1", help="host for the alignment service")
+    parser.add_argument("--port", type=int, default=8765, help="port for the alignment service")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes for the alignment service")
+    parser.add_argument("--max-queue", type=int, default=100, help="maximum number of queued jobs for the alignment service")
+    parser.add_argument("--cache-size", type=int, default=1000, help="maximum number of cached results in the alignment service")
+    parser.add_argument("--batch-timeout", type=float, default=120, help="seconds before an alignment in the service is cancelled, only its worker process is restarted")
+    parser.add_argument("--service-url", default=None, help="submit alignments to a running service, e.g. http://127.0.0.1:8765")
+    args = parser.parse_args()
+
+    if args.serve:
+        from service.server import AlignmentServer
+
+        AlignmentServer(args.host, args.port, max_workers=args.workers, max_queue_size=args.max_queue,
+                        max_cache_size=args.cache_size, batch_timeout=args.batch_timeout).run()
+    else:
+        from controller.controller import Controller
+
+        controller = Controller(args.service_url)
+        controller.run()
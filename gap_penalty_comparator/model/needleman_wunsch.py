@@ -2,7 +2,7 @@ import blosum as bl
 import numpy as np
 
 
-def value_propagation(seq1, seq2, gap_penalty, use_blosum):
+def value_propagation(seq1, seq2, gap_penalty, use_blosum, substitution_scores=None):
     """
     Constructs the alignment matrix according to the Needleman-Wunsch algorithm
     for global alignment.
@@ -13,6 +13,8 @@ def value_propagation(seq1, seq2, gap_penalty, use_blosum):
         gap_penalty (int): penalty for gaps
         use_blosum (bool): whether to use BLOSUM62 matrix for scoring (True), or
                             match/mismatch scoring of 1/-1 (False)
+        substitution_scores (np.array): optional precomputed scores from score_substitutions,
+                                        so several gap penalties can share the lookups
 
     Returns:
         (tuple): tuple containing:
@@ -20,35 +22,39 @@ def value_propagation(seq1, seq2, gap_penalty, use_blosum):
         arrow_matrix (np.array): The matrix with values representing arrows for backtracking.
                                 1 for diagonal, 2 for top, 3 for left
     """
-    match_score = 1
-    mismatch_score = -1
-
     value_matrix = initialize_value_matrix(seq1, seq2, gap_penalty)
     arrow_matrix = initialize_arrow_matrix(seq1, seq2)
 
-    if use_blosum:
-        blosum_matrix = bl.BLOSUM(62)
+    if substitution_scores is None:
+        substitution_scores = score_substitutions(seq1, seq2, use_blosum)
 
     for row in range(1, value_matrix.shape[0]):
         for col in range(1, value_matrix.shape[1]):
-            seq1_char = seq1[row - 1]
-            seq2_char = seq2[col - 1]
-
-            is_match = seq1_char == seq2_char
-
             top_val = value_matrix[row - 1, col] + gap_penalty
             left_val = value_matrix[row, col - 1] + gap_penalty
-
-            if use_blosum:
-                diag_val = value_matrix[row - 1, col - 1] + blosum_matrix[seq1_char][seq2_char]
-            else:
-                diag_val = value_matrix[row - 1, col - 1] + (match_score if is_match else mismatch_score)
+            diag_val = value_matrix[row - 1, col - 1] + substitution_scores[row - 1, col - 1]
 
             value_matrix[row, col] = max(top_val, left_val, diag_val)
             arrow_matrix[row, col] = value_to_arrows(top_val, left_val, diag_val)
 
     return value_matrix, arrow_matrix
 
+def score_substitutions(seq1, seq2, use_blosum):
+    """
+    Look up the substitution score for every pair of characters in the two sequences.
+    Row i and column j hold the score for seq1[i] against seq2[j].
+    """
+    match_score = 1
+    mismatch_score = -1
+
+    if use_blosum:
+        blosum_matrix = bl.BLOSUM(62)
+        return np.array([[blosum_matrix[seq1_char][seq2_char] for seq2_char in seq2] for seq1_char in seq1],
+                        dtype=float).reshape(len(seq1), len(seq2))
+
+    is_match = np.array(list(seq1))[:, np.newaxis] == np.array(list(seq2))[np.newaxis, :]
+    return np.where(is_match, match_score, mismatch_score).astype(float).reshape(len(seq1), len(seq2))
+
 def value_to_arrows(top_val, left_val, diag_val):
     """
     Find corresponding arrows for backtracking.
@@ -0,0 +1,165 @@
+import blosum as bl
+import numpy as np
+
+
+def significance_test(seq1, seq2, gap_penalty, use_blosum, max_shuffles=4000, batch_size=100,
+                      seed=0, p_tolerance=0.01, relative_tolerance=0.1, null_model=None):
+    """
+    Compares the global alignment score of seq1 and seq2 against a null
+    distribution of scores for seq1 aligned to shuffled versions of seq2.
+
+    Shuffles are generated and scored in batches. Sampling stops early once the
+    half-width of the p-value's 95% Wilson confidence interval is below
+    p_tolerance or relative_tolerance times the p-value, whichever is larger.
+    The z-score is not part of the rule, as its batch-to-batch noise grows with
+    its size. The default max_shuffles is large enough for the default
+    tolerances to be met for any p-value; the hardest case is around
+    p = p_tolerance / relative_tolerance, which needs about 3500 shuffles.
+
+    Args:
+        seq1 (str): sequence 1
+        seq2 (str): sequence 2, the sequence that is shuffled
+        gap_penalty (int): penalty for gaps
+        use_blosum (bool): whether to use BLOSUM62 matrix for scoring (True), or
+                            match/mismatch scoring of 1/-1 (False)
+        max_shuffles (int): maximum number of shuffles to score
+        batch_size (int): number of shuffles scored per batch
+        seed (int): seed for the shuffles, so results are reproducible
+        p_tolerance (float): absolute convergence tolerance for the p-value
+        relative_tolerance (float): convergence tolerance for the p-value, relative to the p-value
+        null_model (tuple): optional result of build_null_model, so several gap
+                            penalties can share the substitution lookups
+
+    Returns:
+        (dict): dict containing:
+        score (float): the alignment score of the unshuffled sequences
+        z_score (float): number of standard deviations the score lies above the
+                         mean shuffled score, or None if the shuffled scores do not vary
+        p_value (float): empirical p-value, the fraction of shuffles scoring at
+                         least as high as the real alignment
+        num_shuffles (int): number of shuffles that were scored
+        converged (bool): whether the early stopping rule was met
+    """
+    profile, seq2_codes = null_model if null_model is not None else build_null_model(seq1, seq2, use_blosum)
+    score = float(batch_alignment_scores(profile, seq2_codes[np.newaxis, :], gap_penalty)[0])
+
+    rng = np.random.default_rng(seed)
+    null_scores = np.empty(0)
+    converged = False
+
+    while len(null_scores) < max_shuffles:
+        num_shuffles = min(batch_size, max_shuffles - len(null_scores))
+        shuffles = rng.permuted(np.tile(seq2_codes, (num_shuffles, 1)), axis=1)
+        null_scores = np.concatenate([null_scores, batch_alignment_scores(profile, shuffles, gap_penalty)])
+
+        p_value, z_score = null_statistics(score, null_scores)
+
+        # The p-value counts the real alignment as one of the samples, see null_statistics
+        p_half_width = wilson_half_width(p_value, len(null_scores) + 1)
+        if p_half_width < max(p_tolerance, relative_tolerance * p_value):
+            converged = True
+            break
+
+    return {
+        "score": score,
+        "z_score": z_score,
+        "p_value": p_value,
+        "num_shuffles": len(null_scores),
+        "converged": converged,
+    }
+
+
+def build_null_model(seq1, seq2, use_blosum):
+    """
+    Encodes seq2 and looks up the substitution scores of each character of seq1
+    against the alphabet. The result is shared by all shuffles, and by all gap
+    penalties for the same pair.
+
+    Returns:
+        (tuple): tuple containing:
+        profile (np.array): substitution scores for each character of seq1 (rows)
+                            against each alphabet character (columns)
+        seq2_codes (np.array): seq2 as indices into the alphabet
+    """
+    alphabet = sorted(set(seq1) | set(seq2))
+    seq1_codes = encode_sequence(seq1, alphabet)
+    seq2_codes = encode_sequence(seq2, alphabet)
+    profile = substitution_matrix(alphabet, use_blosum)[seq1_codes]
+
+    return profile, seq2_codes
+
+
+def null_statistics(score, null_scores):
+    """
+    Calculates the empirical p-value and z-score of a score against the null scores.
+    The p-value counts the real alignment as one of the samples, so it is never 0.
+    """
+    p_value = (np.count_nonzero(null_scores >= score) + 1) / (len(null_scores) + 1)
+
+    std = np.std(null_scores, ddof=1) if len(null_scores) > 1 else 0
+    z_score = float((score - np.mean(null_scores)) / std) if std > 0 else None
+
+    return float(p_value), z_score
+
+
+def wilson_half_width(proportion, trials, z=1.96):
+    """
+    Half-width of the Wilson score interval for a proportion. Unlike the normal
+    approximation, it stays above 0 when the proportion is 0 or 1.
+    """
+    return z / (1 + z ** 2 / trials) * np.sqrt(proportion * (1 - proportion) / trials + z ** 2 / (4 * trials ** 2))
+
+
+def batch_alignment_scores(profile, seq2_batch, gap_penalty):
+    """
+    Calculates only the final Needleman-Wunsch score for seq1 against a batch of
+    sequences of equal length, without storing the full matrices or arrows.
+
+    Each row of the alignment matrix is computed for all sequences at once.
+    With a linear gap penalty, a cell's best value coming from the left is
+    H[j] = max over k <= j of (D[k] + (j - k) * gap), where D holds the best
+    value from the top or diagonal. This is a running maximum, so the whole row
+    is computed without a loop over columns.
+
+    Args:
+        profile (np.array): substitution scores for each character of seq1 (rows)
+                            against each alphabet character (columns)
+        seq2_batch (np.array): encoded sequences, one per row
+        gap_penalty (int): penalty for gaps
+
+    Returns:
+        scores (np.array): the alignment score for each sequence in the batch
+    """
+    num_seqs, seq2_len = seq2_batch.shape
+    col_penalties = np.arange(seq2_len + 1) * gap_penalty
+
+    # First row of the matrix, identical for every sequence in the batch
+    prev_row = np.tile(col_penalties.astype(float), (num_seqs, 1))
+
+    for row, substitution_row in enumerate(profile, start=1):
+        best = np.empty_like(prev_row)
+        best[:, 0] = row * gap_penalty
+        best[:, 1:] = np.maximum(prev_row[:, :-1] + substitution_row[seq2_batch],
+                                 prev_row[:, 1:] + gap_penalty)
+
+        prev_row = np.maximum.accumulate(best - col_penalties, axis=1) + col_penalties
+
+    return prev_row[:, -1]
+
+
+def substitution_matrix(alphabet, use_blosum):
+    """
+    Constructs the substitution scores between all characters of the alphabet,
+    using BLOSUM62 or match/mismatch scoring of 1/-1.
+    """
+    if use_blosum:
+        blosum_matrix = bl.BLOSUM(62)
+        return np.array([[blosum_matrix[a][b] for b in alphabet] for a in alphabet], dtype=float)
+
+    return np.where(np.eye(len(alphabet), dtype=bool), 1.0, -1.0)
+
+
+def encode_sequence(seq, alphabet):
+    """Converts a sequence to an array of indices into the alphabet."""
+    indices = {char: i for i, char in enumerate(alphabet)}
+    return np.array([indices[char] for char in seq], dtype=int)
@@ -0,0 +1,306 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import OrderedDict, deque
+from statistics import fmean
+
+import numpy as np
+from model.needleman_wunsch import (backtrack_global_alignment, find_gaps,
+                                    score_substitutions, value_propagation)
+from model.significance import build_null_model, significance_test
+
+from .worker_process import WorkerDiedError, WorkerProcess
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has reached its maximum depth."""
+
+
+def compute_alignments(seq1, seq2, gap_penalties, scoring_method):
+    """
+    Runs the Needleman-Wunsch algorithm for one sequence pair and several gap
+    penalties. The substitution lookups are done once and shared by all
+    penalties, both for the alignments and the significance tests. Runs inside
+    a worker process, so the results are returned as plain lists that can be
+    pickled and serialized to JSON.
+
+    Returns:
+        results (dict): maps each gap penalty to a dict with the value matrix,
+                        arrow matrix, alignment coordinates, gaps and significance
+    """
+    use_blosum = scoring_method == "BLOSUM62"
+    substitution_scores = score_substitutions(seq1, seq2, use_blosum)
+    null_model = build_null_model(seq1, seq2, use_blosum)
+    results = {}
+
+    for penalty in gap_penalties:
+        val_matrix, arrow_matrix = value_propagation(seq1, seq2, penalty, use_blosum, substitution_scores)
+        coordinate_list = backtrack_global_alignment(seq1, seq2, arrow_matrix, val_matrix)
+
+        results[penalty] = {
+            "value_matrix": val_matrix.tolist(),
+            "arrow_matrix": [[[int(arrow) for arrow in arrows] for arrows in row] for row in arrow_matrix],
+            "alignment_coordinates": [[int(row), int(col)] for row, col in coordinate_list],
+            "gaps": find_gaps(coordinate_list),
+            "significance": significance_test(seq1, seq2, penalty, use_blosum, null_model=null_model),
+        }
+
+    return results
+
+
+def decode_results(results):
+    """
+    Converts JSON results from the service back into the types produced by
+    AlignmentWorker, so they can be passed to the view unchanged.
+
+    Returns:
+        (tuple): tuple containing lists of value matrices, arrow matrices,
+                 alignment coordinates, gaps and significance, one entry per gap penalty
+    """
+    value_matrices = []
+    arrow_matrices = []
+    alignment_coordinates = []
+    gaps = []
+    significance = []
+
+    for result in results:
+        value_matrices.append(np.array(result["value_matrix"], dtype=float))
+
+        rows = result["arrow_matrix"]
+        arrow_matrix = np.empty((len(rows), len(rows[0])), dtype=object)
+        for r, row in enumerate(rows):
+            for c, arrows in enumerate(row):
+                arrow_matrix[r, c] = np.array(arrows, dtype=int)
+        arrow_matrices.append(arrow_matrix)
+
+        alignment_coordinates.append([tuple(coordinate) for coordinate in result["alignment_coordinates"]])
+        gaps.append(result["gaps"])
+        significance.append(result["significance"])
+
+    return value_matrices, arrow_matrices, alignment_coordinates, gaps, significance
+
+
+class AlignmentService:
+    """
+    Shares alignment results between several clients.
+
+    The max_cache_size most recently used results are cached, so each (sequence
+    pair, scoring method, gap penalty) is computed once while it stays cached.
+    Identical requests that arrive while a computation is running wait for the
+    same future. Queued penalties for the same sequence pair are batched into
+    one call to a worker process, which shares the substitution lookups between
+    the penalties. The computation can be replaced with compute, which must be
+    a picklable function with the same arguments as compute_alignments.
+    """
+
+    def __init__(self, max_workers=None, max_queue_size=100, batch_window=0.01, batch_timeout=120,
+                 max_cache_size=1000, latency_window=1000, compute=compute_alignments):
+        self.max_queue_size = max_queue_size
+        self.batch_window = batch_window
+        self.batch_timeout = batch_timeout
+        self.compute = compute
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Workers are spawned rather than forked, so they do not inherit open client sockets
+        # and keep those connections from closing
+        self.mp_context = multiprocessing.get_context("spawn")
+        # Idle worker processes, started on first use (None until then)
+        self.idle_workers = asyncio.Queue()
+        for _ in range(self.max_workers):
+            self.idle_workers.put_nowait(None)
+        # Queued penalties per sequence pair, in the order the pairs were first queued
+        self.queue = {}
+        self.jobs_queued = asyncio.Event()
+
+        self.max_cache_size = max_cache_size
+        self.cache = OrderedDict()
+        self.in_flight = {}
+        self.latencies = deque(maxlen=latency_window)
+        self.counters = {"requests": 0, "cache_hits": 0, "coalesced": 0, "computed": 0, "batches": 0, "errors": 0, "timeouts": 0}
+
+        self.dispatcher = None
+        self.batch_tasks = set()
+
+    def start(self):
+        """Starts the dispatcher task. Must be called from a running event loop."""
+        self.dispatcher = asyncio.create_task(self.dispatch())
+
+    async def stop(self):
+        """Stops the dispatcher, cancels running batches and stops the worker processes."""
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+            await asyncio.gather(self.dispatcher, return_exceptions=True)
+        for task in self.batch_tasks:
+            task.cancel()
+        await asyncio.gather(*self.batch_tasks, return_exceptions=True)
+
+        while not self.idle_workers.empty():
+            worker = self.idle_workers.get_nowait()
+            if worker is not None:
+                worker.close()
+
+    async def align(self, seq1, seq2, gap_penalties, scoring_method):
+        """
+        Returns the alignment results for each gap penalty, in the same order
+        as gap_penalties.
+
+        Raises:
+            QueueFullError: if a penalty has to be computed and the queue is full
+        """
+        start = time.perf_counter()
+        self.counters["requests"] += 1
+        pair_key = (seq1, seq2, scoring_method)
+
+        results = {}
+        pending = {}
+        jobs = []
+        for penalty in dict.fromkeys(gap_penalties):
+            key = pair_key + (penalty,)
+            if key in self.cache:
+                self.counters["cache_hits"] += 1
+                self.cache.move_to_end(key)
+                results[penalty] = self.cache[key]
+            elif key in self.in_flight:
+                self.counters["coalesced"] += 1
+                pending[penalty] = self.in_flight[key]
+            else:
+                jobs.append(key)
+
+        # Check capacity before registering anything, so a rejected request leaves no state behind
+        if self.queue_depth() + len(jobs) > self.max_queue_size:
+            raise QueueFullError(f"Job queue is full ({self.queue_depth()} jobs waiting).")
+
+        loop = asyncio.get_running_loop()
+        for key in jobs:
+            future = loop.create_future()
+            self.in_flight[key] = future
+            pending[key[-1]] = future
+            self.queue.setdefault(pair_key, []).append(key[-1])
+        if jobs:
+            self.jobs_queued.set()
+
+        try:
+            # Shield the shared futures so a disconnecting client does not cancel them for everyone else
+            # Results are taken from the futures, as they may already have been evicted from the cache
+            for penalty, future in pending.items():
+                results[penalty] = await asyncio.shield(future)
+            return [results[penalty] for penalty in gap_penalties]
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    async def dispatch(self):
+        """
+        Waits for a free worker process, then takes the oldest queued sequence
+        pair off the queue together with all of its queued penalties, and
+        submits them as one batch. Jobs stay in the queue until a worker is
+        free, so they can still be batched and are counted in the queue depth.
+        """
+        while True:
+            worker = await self.idle_workers.get()
+            try:
+                while not self.queue:
+                    self.jobs_queued.clear()
+                    await self.jobs_queued.wait()
+                # Give requests for the same pair a moment to arrive and join the batch
+                await asyncio.sleep(self.batch_window)
+            except asyncio.CancelledError:
+                self.idle_workers.put_nowait(worker)
+                raise
+
+            pair_key = next(iter(self.queue))
+            penalties = self.queue.pop(pair_key)
+            task = asyncio.create_task(self.run_batch(worker, pair_key, penalties))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+
+    async def run_batch(self, worker, pair_key, penalties):
+        """
+        Computes all penalties for one sequence pair in a single worker process.
+        If the batch times out, is cancelled or the worker dies, only that worker
+        is terminated and replaced, so batches in other workers are unaffected.
+        """
+        seq1, seq2, scoring_method = pair_key
+        self.counters["batches"] += 1
+
+        try:
+            if worker is None:
+                worker = WorkerProcess(self.mp_context)
+            results = await worker.run(self.compute, (seq1, seq2, penalties, scoring_method), self.batch_timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            worker = self.replace_worker(worker)
+            self.fail_batch(pair_key, penalties, TimeoutError(f"Alignment took longer than {self.batch_timeout} seconds."))
+            return
+        except asyncio.CancelledError:
+            worker = self.replace_worker(worker)
+            self.fail_batch(pair_key, penalties, RuntimeError("The alignment service is shutting down."))
+            raise
+        except Exception as e:
+            self.counters["errors"] += 1
+            if isinstance(e, WorkerDiedError):
+                worker = self.replace_worker(worker)
+            self.fail_batch(pair_key, penalties, e)
+            return
+        finally:
+            self.idle_workers.put_nowait(worker)
+
+        for penalty in penalties:
+            key = pair_key + (penalty,)
+            self.store(key, results[penalty])
+            self.counters["computed"] += 1
+            future = self.in_flight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(results[penalty])
+
+    def store(self, key, result):
+        """Caches a result, evicting the least recently used results when the cache is full."""
+        self.cache[key] = result
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_cache_size:
+            self.cache.popitem(last=False)
+
+    def fail_batch(self, pair_key, penalties, error):
+        """Passes an error to every request waiting for the batch."""
+        for penalty in penalties:
+            future = self.in_flight.pop(pair_key + (penalty,), None)
+            if future is not None and not future.done():
+                future.set_exception(error)
+                # Mark the error as retrieved in case every waiting client has disconnected
+                future.exception()
+
+    def replace_worker(self, worker):
+        """
+        Terminates a worker that is stuck or dead. Returns None, so a new worker
+        is started for the next batch.
+        """
+        if worker is not None:
+            worker.terminate()
+        return None
+
+    def queue_depth(self):
+        """Returns the number of penalties waiting for a worker process."""
+        return sum(len(penalties) for penalties in self.queue.values())
+
+    def metrics(self):
+        """Returns queue depth, cache and latency metrics as a JSON-serializable dict."""
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0
+
+        return {
+            "queue_depth": self.queue_depth(),
+            "max_queue_size": self.max_queue_size,
+            "in_flight": len(self.in_flight),
+            "running_batches": len(self.batch_tasks),
+            "cache_size": len(self.cache),
+            "max_cache_size": self.max_cache_size,
+            **self.counters,
+            "latency_ms": {
+                "count": len(latencies),
+                "mean": round(fmean(latencies) * 1000, 2) if latencies else 0,
+                "p50": round(percentile(0.5) * 1000, 2),
+                "p95": round(percentile(0.95) * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2) if latencies else 0,
+            },
+        }
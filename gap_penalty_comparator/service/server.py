@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+from .alignment_service import AlignmentService, QueueFullError
+
+# Same input rules as the GUI, see Controller.parse_input and Controller.validate_seq_input
+VALID_CHARS = set("ARNDCQEGHILKMFPSTWYVBZX")
+SCORING_METHODS = ("BLOSUM62", "Identity")
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class AlignmentServer:
+    """
+    Minimal HTTP/JSON server exposing an AlignmentService.
+
+    Endpoints:
+        POST /align: body {"seq1", "seq2", "gap_penalties", "scoring_method"},
+                     responds with {"results": [...]}, one entry per gap penalty
+        GET /metrics: queue depth, cache and latency metrics
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, **service_options):
+        self.host = host
+        self.port = port
+        self.service_options = service_options
+
+    async def serve(self):
+        """Starts the service and serves requests until cancelled."""
+        self.service = AlignmentService(**self.service_options)
+        self.service.start()
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+
+        print(f"Alignment service listening on http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.service.stop()
+
+    def run(self):
+        """Runs the server until interrupted."""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
+
+    async def handle_connection(self, reader, writer):
+        """Reads a single HTTP request, handles it, and closes the connection."""
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if len(request_line) < 2:
+                status, payload = 400, {"error": "Malformed request line."}
+            else:
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self.handle_request(request_line[0], request_line[1], body)
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+
+        data = json.dumps(payload).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n"
+                     f"Connection: close\r\n\r\n".encode("latin-1") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle_request(self, method, path, body):
+        """
+        Routes a request to the matching endpoint.
+
+        Returns:
+            (tuple): HTTP status code and JSON-serializable response payload
+        """
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "Use GET for /metrics."}
+            return 200, self.service.metrics()
+
+        if path != "/align":
+            return 404, {"error": f"Unknown path {path}."}
+        if method != "POST":
+            return 405, {"error": "Use POST for /align."}
+
+        try:
+            request = json.loads(body)
+            seq1 = self.parse_sequence(request["seq1"])
+            seq2 = self.parse_sequence(request["seq2"])
+            gap_penalties = [int(p) for p in request["gap_penalties"]]
+            scoring_method = str(request["scoring_method"])
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"Invalid request body: {e}"}
+
+        if not seq1 or not seq2:
+            return 400, {"error": "Both sequences must be non-empty."}
+        if not set(seq1).issubset(VALID_CHARS) or not set(seq2).issubset(VALID_CHARS):
+            return 400, {"error": "One or both sequences contain invalid characters. Only letters representing amino acids and nucleotides are allowed."}
+        if scoring_method not in SCORING_METHODS:
+            return 400, {"error": f"Unknown scoring method {scoring_method}. Use one of: {', '.join(SCORING_METHODS)}."}
+        if not gap_penalties:
+            return 400, {"error": "At least one gap penalty is required."}
+
+        try:
+            results = await self.service.align(seq1, seq2, gap_penalties, scoring_method)
+        except QueueFullError as e:
+            return 503, {"error": str(e)}
+
+        return 200, {"results": results}
+
+    def parse_sequence(self, sequence):
+        """Removes whitespace and converts the sequence to uppercase."""
+        if not isinstance(sequence, str):
+            raise TypeError("sequences must be strings")
+        return ''.join(sequence.upper().split())
@@ -0,0 +1,96 @@
+import asyncio
+
+
+class WorkerDiedError(Exception):
+    """Raised when a worker process exits while running a job."""
+
+
+def worker_main(connection):
+    """Runs the jobs sent over the connection until it is closed."""
+    # Tell the parent the process has started, so startup does not count towards the first job's timeout
+    connection.send((True, None))
+    while True:
+        try:
+            function, args = connection.recv()
+        except EOFError:
+            return
+
+        try:
+            connection.send((True, function(*args)))
+        except Exception as e:
+            # Send the message rather than the exception, as not every exception can be pickled
+            connection.send((False, f"{type(e).__name__}: {e}"))
+
+
+class WorkerProcess:
+    """
+    A single worker process that runs one job at a time.
+
+    Unlike a process pool, each worker can be terminated on its own, so a job
+    that runs too long does not affect jobs running in other workers.
+    """
+
+    def __init__(self, context):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_connection,), daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.receiving = None
+        self.started = False
+
+    async def run(self, function, args, timeout=None):
+        """
+        Runs function(*args) in the worker process and returns the result.
+
+        Raises:
+            asyncio.TimeoutError: if the job takes longer than timeout seconds.
+                                  The worker keeps running and should be terminated.
+            WorkerDiedError: if the worker process exited during the job
+            RuntimeError: if the job raised an exception
+        """
+        try:
+            if not self.started:
+                await self.receive(None)
+                self.started = True
+            self.connection.send((function, args))
+            succeeded, result = await self.receive(timeout)
+        except asyncio.TimeoutError:
+            # Checked first, as TimeoutError is a subclass of OSError
+            raise
+        except (EOFError, OSError):
+            raise WorkerDiedError(f"Worker process exited with code {self.process.exitcode}.")
+
+        if not succeeded:
+            raise RuntimeError(result)
+        return result
+
+    async def receive(self, timeout):
+        """Waits for the next message from the worker process."""
+        # Wait in a thread, as pipes cannot be awaited on every platform
+        self.receiving = asyncio.ensure_future(asyncio.to_thread(self.connection.recv))
+        return await asyncio.wait_for(asyncio.shield(self.receiving), timeout)
+
+    def terminate(self):
+        """Stops the worker process, even if it is in the middle of a job."""
+        self.process.terminate()
+        self.process.join()
+        # The receiving thread ends once the process is gone, close the pipe after it is done with it
+        if self.receiving is not None and not self.receiving.done():
+            self.receiving.add_done_callback(self.close_connection)
+        else:
+            self.connection.close()
+
+    def close_connection(self, receiving):
+        """Closes the pipe once the receiving thread has ended."""
+        # Retrieve the expected EOFError so it is not reported as unhandled
+        if not receiving.cancelled():
+            receiving.exception()
+        self.connection.close()
+
+    def close(self, timeout=5):
+        """Lets the worker process exit after its current job, or terminates it after timeout seconds."""
+        self.connection.close()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app imports its packages relative to the inner directory, like main.py
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
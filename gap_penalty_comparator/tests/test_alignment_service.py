@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import pytest
+from service.alignment_service import AlignmentService, QueueFullError
+
+
+def stub_compute(seq1, seq2, gap_penalties, scoring_method):
+    """Cheap stand-in for compute_alignments. seq2 is the number of seconds to sleep."""
+    if seq1 == "FAIL":
+        raise ValueError("bad input")
+    time.sleep(float(seq2))
+    return {penalty: {"seq1": seq1, "penalty": penalty} for penalty in gap_penalties}
+
+
+def run_with_service(test, **options):
+    """Runs the async test function with a started service, and stops the service afterwards."""
+    async def main():
+        service = AlignmentService(compute=stub_compute, **options)
+        service.start()
+        try:
+            return await test(service)
+        finally:
+            await service.stop()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_penalties_for_one_pair_are_batched():
+    async def test(service):
+        results = await asyncio.gather(service.align("A", "0", [-1, -2], "Identity"),
+                                       service.align("A", "0", [-3], "Identity"))
+
+        assert [[r["penalty"] for r in result] for result in results] == [[-1, -2], [-3]]
+        assert service.counters["batches"] == 1
+        assert service.counters["computed"] == 3
+
+    run_with_service(test, max_workers=1)
+
+
+def test_identical_in_flight_requests_are_coalesced():
+    async def test(service):
+        first, second = await asyncio.gather(service.align("A", "0.2", [-1], "Identity"),
+                                             service.align("A", "0.2", [-1], "Identity"))
+
+        assert first == second
+        assert service.counters["coalesced"] == 1
+        assert service.counters["computed"] == 1
+
+        await service.align("A", "0.2", [-1], "Identity")
+        assert service.counters["cache_hits"] == 1
+        assert service.counters["batches"] == 1
+
+    run_with_service(test, max_workers=1)
+
+
+def test_over_capacity_request_leaves_no_state():
+    async def test(service):
+        # Occupy the only worker, then fill the queue
+        busy = asyncio.create_task(service.align("BUSY", "0.5", [-1], "Identity"))
+        await asyncio.sleep(0.1)
+        queued = asyncio.create_task(service.align("A", "0", [-1, -2], "Identity"))
+        await asyncio.sleep(0)
+        assert service.queue_depth() == 2
+
+        with pytest.raises(QueueFullError):
+            await service.align("B", "0", [-1], "Identity")
+
+        assert list(service.queue) == [("A", "0", "Identity")]
+        assert not any(key[0] == "B" for key in service.in_flight)
+
+        await asyncio.gather(busy, queued)
+        assert service.queue_depth() == 0
+        assert not service.in_flight
+
+    run_with_service(test, max_workers=1, max_queue_size=2)
+
+
+def test_results_follow_request_order_with_repeated_penalties():
+    async def test(service):
+        results = await service.align("A", "0", [-2, -1, -2], "Identity")
+
+        assert [result["penalty"] for result in results] == [-2, -1, -2]
+        assert service.counters["computed"] == 2
+
+    run_with_service(test, max_workers=1)
+
+
+def test_results_are_returned_after_eviction_from_cache():
+    async def test(service):
+        results = await service.align("A", "0", [-1, -2, -3], "Identity")
+
+        assert [result["penalty"] for result in results] == [-1, -2, -3]
+        assert list(service.cache) == [("A", "0", "Identity", -3)]
+
+    run_with_service(test, max_workers=1, max_cache_size=1)
+
+
+def test_timeout_only_fails_its_own_batch():
+    async def test(service):
+        slow, fast = await asyncio.gather(service.align("SLOW", "30", [-1], "Identity"),
+                                          service.align("FAST", "0.2", [-1], "Identity"),
+                                          return_exceptions=True)
+
+        assert isinstance(slow, TimeoutError)
+        assert fast[0]["seq1"] == "FAST"
+        assert service.counters["timeouts"] == 1
+
+        # The stuck worker was replaced, so the service keeps working
+        results = await service.align("AFTER", "0", [-1], "Identity")
+        assert results[0]["seq1"] == "AFTER"
+
+    run_with_service(test, max_workers=2, batch_timeout=2)
+
+
+def test_compute_errors_are_passed_to_waiting_requests():
+    async def test(service):
+        with pytest.raises(RuntimeError, match="bad input"):
+            await service.align("FAIL", "0", [-1], "Identity")
+
+        assert service.counters["errors"] == 1
+        assert not service.in_flight
+
+    run_with_service(test, max_workers=1)
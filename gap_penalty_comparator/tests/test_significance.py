@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from model.needleman_wunsch import value_propagation
+from model.significance import (batch_alignment_scores, build_null_model,
+                                null_statistics, significance_test,
+                                wilson_half_width)
+
+AMINO_ACIDS = "ARNDCQEGHILKMFPSTWYVBZX"
+
+
+@pytest.mark.parametrize("use_blosum", [True, False])
+@pytest.mark.parametrize("gap_penalty", [0, -1, -4, -10])
+def test_batch_scores_match_value_propagation(use_blosum, gap_penalty):
+    rng = np.random.default_rng(abs(gap_penalty))
+    for _ in range(25):
+        seq1 = "".join(rng.choice(list(AMINO_ACIDS), rng.integers(1, 15)))
+        seq2 = "".join(rng.choice(list(AMINO_ACIDS), rng.integers(1, 15)))
+
+        profile, seq2_codes = build_null_model(seq1, seq2, use_blosum)
+        score = batch_alignment_scores(profile, seq2_codes[np.newaxis, :], gap_penalty)[0]
+        value_matrix, _ = value_propagation(seq1, seq2, gap_penalty, use_blosum)
+
+        assert score == value_matrix[-1, -1]
+
+
+def test_batch_scores_are_independent_per_sequence():
+    profile, seq2_codes = build_null_model("HEAGAWGHEE", "PAWHEAE", True)
+    batch = np.array([seq2_codes, seq2_codes[::-1], np.sort(seq2_codes)])
+
+    scores = batch_alignment_scores(profile, batch, -2)
+    single_scores = [batch_alignment_scores(profile, row[np.newaxis, :], -2)[0] for row in batch]
+
+    assert list(scores) == single_scores
+
+
+def test_null_statistics_constant_null_scores():
+    p_value, z_score = null_statistics(5.0, np.full(100, 2.0))
+    assert p_value == pytest.approx(1 / 101)
+    assert z_score is None
+
+    p_value, z_score = null_statistics(2.0, np.full(100, 2.0))
+    assert p_value == 1.0
+    assert z_score is None
+
+
+def test_significance_single_character_seq2():
+    # Every shuffle of a single character is the sequence itself
+    result = significance_test("HEAGAWGHEE", "W", -2, True)
+
+    assert result["p_value"] == 1.0
+    assert result["z_score"] is None
+    assert result["converged"]
+    assert result["score"] == value_propagation("HEAGAWGHEE", "W", -2, True)[0][-1, -1]
+
+
+def test_mid_range_p_value_converges_with_default_settings():
+    result = significance_test("HEAGAWGHEE", "PAWHEAE", -2, True)
+
+    assert 0.027 < result["p_value"] < 0.277
+    assert result["converged"]
+    assert result["num_shuffles"] <= 4000
+
+
+@pytest.mark.parametrize("proportion", [0.0, 1.0])
+def test_wilson_interval_has_width_at_the_bounds(proportion):
+    assert wilson_half_width(proportion, 100) > 0
+    assert wilson_half_width(proportion, 1000) < wilson_half_width(proportion, 100)
@@ -1,18 +1,16 @@
 from statistics import fmean
 
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import \
-    FigureCanvasQTAgg as FigureCanvas
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont, QIntValidator
+from PyQt6.QtGui import QFont, QIntValidator, QPixmap
 from PyQt6.QtWidgets import (QApplication, QButtonGroup, QFrame, QHBoxLayout,
-                             QMessageBox, QRadioButton, QScrollArea,
+                             QLabel, QMessageBox, QRadioButton, QScrollArea,
                              QVBoxLayout, QWidget)
 
 from .components.button import Button
 from .components.label import Label
 from .components.table import Table
 from .components.text_field import TextField
+from .render_worker import RenderWorker
 
 
 class MainWindow(QScrollArea):
@@ -22,6 +20,10 @@ class MainWindow(QScrollArea):
         self.showMaximized()
         
         self.gaps = []
+        self.render_worker = None
+        # Interrupted render workers, kept until they finish so they are not destroyed while running
+        self.interrupted_render_workers = []
+        self.significance = []
     
     def keyPressEvent(self, event):
         """Handle key press events."""
@@ -121,6 +123,8 @@ class MainWindow(QScrollArea):
     def display_matrices(self, value_matrices, arrow_matrices, sequences, alignment_coordinates, gap_penalties):
         """
         Displays the generated alignment matrices with labels and arrows.
+        The figures are rendered by a background worker, and each penalty's
+        panel is shown as soon as its image is ready.
 
         Args:
             value_matrices (list(np.array)): list of alignment matrices with scores
@@ -128,109 +132,98 @@ class MainWindow(QScrollArea):
             sequences (tuple): tuple containing the two sequences being aligned
             alignment_coordinates (list(list(int))): nested list of coordinates for positions of the alignment cells
         """
-        seq1, seq2 = sequences
         self.toggle_matrices_view(True)
         self.matrices_layout.removeWidget(self.table) if hasattr(self, 'table') else None
         self.create_and_populate_table()
 
         num_matrices = len(value_matrices)
+        fig_width = 5
         fig_height = max(5, 3 * num_matrices)
 
-        # Keep canvas from shrinking when switching views by deleting it before creating a new one
-        if hasattr(self, 'canvas') and self.canvas is not None:
-            self.matrices_layout = self.matrices_frame.layout()
-            self.matrices_layout.removeWidget(self.canvas)
-            self.canvas.deleteLater()
-            self.canvas = None
-
-        self.figure, axes = plt.subplots(nrows=num_matrices, figsize=(5, fig_height))
-        self.canvas = FigureCanvas(self.figure)
-
-        if num_matrices == 1:
-            axes = [axes]
-
-        for i, (val_matrix, ax, arrow_matrix, coordinates) in enumerate(zip(value_matrices, axes, arrow_matrices, alignment_coordinates)):
-            ax.clear()
+        # Stop rendering results from a previous calculation
+        if self.render_worker is not None:
+            self.render_worker.requestInterruption()
+            self.interrupted_render_workers.append(self.render_worker)
+            self.render_worker = None
 
-            display_matrix = self.add_sequence_labels(val_matrix, seq1, seq2)
-            self.overlay_arrows(arrow_matrix, display_matrix)
-
-            table = ax.table(cellText=display_matrix, loc='center', cellLoc='center', bbox=[0, 0, 1, 1])
-            self.format_matrix_cells(table, coordinates)
-                    
-            ax.axis('off')
-            ax.set_title(f"Gap penalty = {gap_penalties[i]}", fontsize=16) # TODO add penalty title
-
-        self.figure.tight_layout()
+        # Keep panels from shrinking when switching views by deleting them before creating new ones
+        if hasattr(self, 'panels') and self.panels is not None:
+            self.matrices_layout = self.matrices_frame.layout()
+            self.matrices_layout.removeWidget(self.panels)
+            self.panels.deleteLater()
+            self.panels = None
 
         max_seq_length = max(len(sequences[0]), len(sequences[1]))
 
-        # Quadratic scaling function for the canvas size
-        calculated_width = int(self.figure.get_size_inches()[0] * (50 + 0.5 * max_seq_length ** 2))
+        # Quadratic scaling function for the size of all panels combined
+        calculated_width = int(fig_width * (50 + 0.5 * max_seq_length ** 2))
         calculated_height = int(fig_height * (200 + 0.5 * max_seq_length ** 2))
 
-        min_width = int(self.figure.get_size_inches()[0] * 150)
+        min_width = int(fig_width * 150)
         min_height = int(fig_height * 150)
 
-        screen_geometry = QApplication.primaryScreen().availableGeometry()
+        screen = QApplication.primaryScreen()
+        screen_geometry = screen.availableGeometry()
         max_width = screen_geometry.width()
         max_height = screen_geometry.height()
 
         # Clamp the width and height to the specified interval
         width = max(min_width, min(calculated_width, max_width))
         height = max(min_height, min(calculated_height, max_height))
-
-        self.canvas.setFixedSize(width, height)
-        self.matrices_layout.addWidget(self.canvas, alignment=Qt.AlignmentFlag.AlignCenter)
-        self.canvas.draw()
-
-    
-    def overlay_arrows(self, arrow_matrix, display_matrix):
-        """Adds arrows to the cell text in the display matrix."""
-        for r, row in enumerate(display_matrix):
-            for c, _ in enumerate(row):
-                if r == 0 or c == 0:
-                    continue
-                arrows = arrow_matrix[r - 1][c - 1]
-                arrow_symbols = ""
-                if 3 in arrows:
-                    arrow_symbols += "←"
-                if 1 in arrows:
-                    arrow_symbols += "↖"
-                if 2 in arrows:
-                    arrow_symbols += "↑"
-                display_matrix[r][c] = f"{arrow_symbols}\n{int(display_matrix[r][c])}"
-
-
-    def add_sequence_labels(self, value_matrix, seq1, seq2):
-        """ Adds the characters of the sequences to the display matrix' first row and column.
-            Leaves the first two elements in the first row and column blank."""
-        display_matrix = [[''] + [''] + list(seq2)]
-        for row_idx, row in enumerate(value_matrix):
-            seq1_char = ''
-            if row_idx > 0 and row_idx <= len(seq1) + 1:
-                seq1_char = seq1[row_idx - 1]
-            display_matrix.append([seq1_char] + row.tolist())
-        
-        return display_matrix
-
-    def format_matrix_cells(self, table, alignment_coordinates):
-        max_font_size = 16 
-        min_font_size = 8
-
-        # Dynamically calculate font size (inverse proportionality)
-        font_size = max(min_font_size, min(max_font_size, int(100 / (len(alignment_coordinates) + 1))))
-
-        for key, cell in table.get_celld().items():
-                row, col = key
-                if row == 0 or col == 0:
-                    cell.set_text_props(weight='bold')
-                    cell.set_facecolor('#cccccc')
-                elif row == 1 and col == 1:
-                        cell.set_facecolor('#0ceb6f')
-                elif (row - 1, col - 1) in alignment_coordinates:
-                    cell.set_facecolor('#85e6b0')
-                cell.set_text_props(fontsize=font_size)
+        panel_size = (width, height // num_matrices)
+
+        self.panels = QWidget()
+        panels_layout = QVBoxLayout(self.panels)
+        panels_layout.setContentsMargins(0, 0, 0, 0)
+        panels_layout.setSpacing(0)
+        self.panel_labels = []
+        for penalty in gap_penalties:
+            # Placeholders keep the layout stable while the images are rendered
+            panel = QLabel(f"Rendering matrix for gap penalty = {penalty}...")
+            panel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            panel.setFixedSize(*panel_size)
+            panels_layout.addWidget(panel)
+            self.panel_labels.append(panel)
+        self.matrices_layout.addWidget(self.panels, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        self.render_worker = RenderWorker(value_matrices, arrow_matrices, sequences, alignment_coordinates,
+                                          gap_penalties, panel_size, screen.devicePixelRatio(), self)
+        self.render_worker.image_ready.connect(self.show_panel_image)
+        self.render_worker.error_occurred.connect(self.on_render_error)
+        self.render_worker.finished.connect(self.on_render_finished)
+        self.render_worker.finished.connect(self.render_worker.deleteLater)
+        self.render_worker.start()
+
+    def show_panel_image(self, index, image):
+        """Shows a rendered matrix image in its panel."""
+        # Images from a previous calculation may still be queued, ignore them
+        if self.sender() is not self.render_worker:
+            return
+        self.panel_labels[index].setPixmap(QPixmap.fromImage(image))
+
+    def on_render_finished(self):
+        """Drops the reference to the render worker once it is done."""
+        worker = self.sender()
+        if worker is self.render_worker:
+            self.render_worker = None
+        elif worker in self.interrupted_render_workers:
+            self.interrupted_render_workers.remove(worker)
+
+    def closeEvent(self, event):
+        """Stops the render workers before closing, as destroying a running thread aborts the application."""
+        workers = self.interrupted_render_workers + ([self.render_worker] if self.render_worker is not None else [])
+        for worker in workers:
+            worker.requestInterruption()
+        for worker in workers:
+            worker.wait()
+        super().closeEvent(event)
+
+    def on_render_error(self, error_message):
+        """Handle errors from the render worker."""
+        if self.sender() is not self.render_worker:
+            return
+        print(error_message)
+        self.popup_dialog("The alignment matrices could not be drawn.", "error")
 
     def show_main_view(self):
         self.toggle_matrices_view(False)
@@ -272,17 +265,26 @@ class MainWindow(QScrollArea):
         """Returns the mean of the gaps or 0 if there are no gaps."""
         return round(fmean(gaps), 1) if gaps else 0
 
+    def format_significance(self, significance):
+        """Returns the alignment score, z-score and p-value formatted for the table."""
+        z_score = "n/a" if significance["z_score"] is None else f"{significance['z_score']:.2f}"
+        p_value = f"{significance['p_value']:.3g}"
+        # Mark estimates where the shuffle limit was reached before they converged
+        if not significance["converged"]:
+            p_value += "*"
+        return [int(significance["score"]), z_score, p_value]
+
     def create_and_populate_table(self):
         """Populates the table with the given items."""
-        self.table = Table(["Num of gaps", "Avg. gap length"],
+        self.table = Table(["Num of gaps", "Avg. gap length", "Score", "Z-score", "p-value"],
                             [f"Penalty={self.gap_penalty1.text()}",
                              f"Penalty={self.gap_penalty2.text()}",
                              f"Penalty={self.gap_penalty3.text()}"],
-                             [[len(self.gaps[0]), self.mean_or_zero(self.gaps[0])],
-                                [len(self.gaps[1]), self.mean_or_zero(self.gaps[1])],
-                                [len(self.gaps[2]), self.mean_or_zero(self.gaps[2])]],
+                             [[len(self.gaps[0]), self.mean_or_zero(self.gaps[0])] + self.format_significance(self.significance[0]),
+                                [len(self.gaps[1]), self.mean_or_zero(self.gaps[1])] + self.format_significance(self.significance[1]),
+                                [len(self.gaps[2]), self.mean_or_zero(self.gaps[2])] + self.format_significance(self.significance[2])],
                             self)
-        self.table.setMaximumWidth(400)
+        self.table.setMaximumWidth(650)
         self.matrices_layout.addWidget(self.table, alignment=Qt.AlignmentFlag.AlignCenter)
     
     def get_sequences(self):
@@ -294,6 +296,9 @@ class MainWindow(QScrollArea):
     
     def set_gaps(self, gaps):
         self.gaps = gaps
+
+    def set_significance(self, significance):
+        self.significance = significance
     
     def get_scoring_method(self):
         """
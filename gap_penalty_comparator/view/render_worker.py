@@ -0,0 +1,126 @@
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+
+
+class RenderWorker(QThread):
+    """
+    Composes and rasterizes the alignment matrix figures off the GUI thread.
+    Uses the Agg backend directly, so no GUI objects are touched, and emits
+    one image per gap penalty as soon as it has been drawn.
+    """
+    image_ready = pyqtSignal(int, QImage)  # Signal with the panel index and its rendered image
+    error_occurred = pyqtSignal(str)  # Signal to send error messages
+
+    def __init__(self, value_matrices, arrow_matrices, sequences, alignment_coordinates, gap_penalties,
+                 panel_size, device_pixel_ratio=1.0, parent=None):
+        super().__init__(parent)
+        self.value_matrices = value_matrices
+        self.arrow_matrices = arrow_matrices
+        self.sequences = sequences
+        self.alignment_coordinates = alignment_coordinates
+        self.gap_penalties = gap_penalties
+        self.panel_size = panel_size
+        self.device_pixel_ratio = device_pixel_ratio
+
+    def run(self):
+        try:
+            for i, penalty in enumerate(self.gap_penalties):
+                # Stop early if the results have been replaced by a newer calculation
+                if self.isInterruptionRequested():
+                    return
+                image = self.render_panel(self.value_matrices[i], self.arrow_matrices[i],
+                                          self.alignment_coordinates[i], penalty)
+                if image is None:
+                    return
+                self.image_ready.emit(i, image)
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+    def render_panel(self, value_matrix, arrow_matrix, coordinates, gap_penalty):
+        """
+        Draws the alignment matrix for one gap penalty into an off-screen image.
+
+        Returns:
+            image (QImage): the rendered figure, scaled for the screen's device pixel ratio,
+                            or None if the worker was interrupted before drawing
+        """
+        seq1, seq2 = self.sequences
+        width, height = self.panel_size
+        dpi = 100 * self.device_pixel_ratio
+
+        figure = Figure(figsize=(width / 100, height / 100), dpi=dpi)
+        canvas = FigureCanvasAgg(figure)
+        ax = figure.add_subplot()
+
+        display_matrix = add_sequence_labels(value_matrix, seq1, seq2)
+        overlay_arrows(arrow_matrix, display_matrix)
+
+        table = ax.table(cellText=display_matrix, loc='center', cellLoc='center', bbox=[0, 0, 1, 1])
+        format_matrix_cells(table, coordinates)
+
+        ax.axis('off')
+        ax.set_title(f"Gap penalty = {gap_penalty}", fontsize=16)
+        figure.tight_layout()
+
+        # Drawing is the slowest step, skip it if the results have been replaced meanwhile
+        if self.isInterruptionRequested():
+            return None
+        canvas.draw()
+
+        buffer = canvas.buffer_rgba()
+        image_width, image_height = canvas.get_width_height(physical=True)
+        # Copy so the image owns its pixels after the figure is garbage collected
+        image = QImage(bytes(buffer), image_width, image_height, QImage.Format.Format_RGBA8888).copy()
+        image.setDevicePixelRatio(self.device_pixel_ratio)
+        return image
+
+
+def overlay_arrows(arrow_matrix, display_matrix):
+    """Adds arrows to the cell text in the display matrix."""
+    for r, row in enumerate(display_matrix):
+        for c, _ in enumerate(row):
+            if r == 0 or c == 0:
+                continue
+            arrows = arrow_matrix[r - 1][c - 1]
+            arrow_symbols = ""
+            if 3 in arrows:
+                arrow_symbols += "←"
+            if 1 in arrows:
+                arrow_symbols += "↖"
+            if 2 in arrows:
+                arrow_symbols += "↑"
+            display_matrix[r][c] = f"{arrow_symbols}\n{int(display_matrix[r][c])}"
+
+
+def add_sequence_labels(value_matrix, seq1, seq2):
+    """ Adds the characters of the sequences to the display matrix' first row and column.
+        Leaves the first two elements in the first row and column blank."""
+    display_matrix = [[''] + [''] + list(seq2)]
+    for row_idx, row in enumerate(value_matrix):
+        seq1_char = ''
+        if row_idx > 0 and row_idx <= len(seq1) + 1:
+            seq1_char = seq1[row_idx - 1]
+        display_matrix.append([seq1_char] + row.tolist())
+
+    return display_matrix
+
+
+def format_matrix_cells(table, alignment_coordinates):
+    max_font_size = 16
+    min_font_size = 8
+
+    # Dynamically calculate font size (inverse proportionality)
+    font_size = max(min_font_size, min(max_font_size, int(100 / (len(alignment_coordinates) + 1))))
+
+    for key, cell in table.get_celld().items():
+        row, col = key
+        if row == 0 or col == 0:
+            cell.set_text_props(weight='bold')
+            cell.set_facecolor('#cccccc')
+        elif row == 1 and col == 1:
+            cell.set_facecolor('#0ceb6f')
+        elif (row - 1, col - 1) in alignment_coordinates:
+            cell.set_facecolor('#85e6b0')
+        cell.set_text_props(fontsize=font_size)